@@ -1,10 +1,12 @@
 import os
 import sys
 import argparse
+from collections import Counter
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.io_helper import emit_success, emit_error
+from utils.fs_helper import walk_entries
 
 def analyze_directory(target_path: str):
     if not os.path.exists(target_path):
@@ -20,25 +22,30 @@ def analyze_directory(target_path: str):
     logs = []
     logs.append(f"Starting analysis of: {target_path}")
 
-    try:
-        for root, dirs, files in os.walk(target_path):
-            if 'node_modules' in dirs:
-                dirs.remove('node_modules')
-            if 'venv' in dirs:
-                dirs.remove('venv')
-            if '.git' in dirs:
-                dirs.remove('.git')
-
-            stats["dirs"] += len(dirs)
-            
-            for file in files:
-                stats["files"] += 1
-                full_path = os.path.join(root, file)
-                stats["total_size_bytes"] += os.path.getsize(full_path)
-                
-                ext = os.path.splitext(file)[1].lower() or "no_ext"
-                stats["extensions"][ext] = stats["extensions"].get(ext, 0) + 1
+    ext_counts = Counter()
+    dirs = 0
+    total_size = 0
 
+    try:
+        for entry in walk_entries(target_path):
+            if entry.is_dir():
+                dirs += 1
+                continue
+
+            total_size += entry.stat().st_size
+
+            # Same result as os.path.splitext: leading dots (".env") are not an extension.
+            # head[0] check first so lstrip() only runs for dotfiles
+            head, sep, tail = entry.name.rpartition('.')
+            if sep and head and (head[0] != '.' or head.lstrip('.')):
+                ext_counts["." + tail.lower()] += 1
+            else:
+                ext_counts["no_ext"] += 1
+
+        stats["files"] = sum(ext_counts.values())
+        stats["dirs"] = dirs
+        stats["extensions"] = dict(ext_counts)
+        stats["total_size_bytes"] = total_size
         emit_success(data=stats, logs=logs)
 
     except Exception as e:
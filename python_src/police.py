@@ -2,47 +2,97 @@ import os
 import sys
 import re
 import argparse
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.io_helper import emit_success, emit_error, emit_log
+from utils.fs_helper import walk_entries
 
-PATTERNS = {
-    "magic_hex": r'#[0-9a-fA-F]{3,6}',  # Ищет hex цвета
-    "inline_style": r'style={{',         # Ищет инлайн стили
-    "raw_button": r'<button',            # Ищет сырые кнопки (должен быть Button)
-    "raw_input": r'<input',              # Ищет сырые инпуты (должен быть Input)
-    "class_name_string": r'className="[^"]*\s{2,}[^"]*"'
+# Правила намеренно не склеены в одну регулярку: через "|" совпадение одного
+# правила «съедает» текст другого (hex внутри className="..." теряется), а обёртка
+# каждого в lookahead отключает в sre поиск по литеральному префиксу — в разы медленнее
+PATTERNS = [
+    ("magic_hex", re.compile(r'#[0-9a-fA-F]{3,6}')),  # Ищет hex цвета
+    ("inline_style", re.compile(r'style={{')),         # Ищет инлайн стили
+    ("raw_button", re.compile(r'<button')),            # Ищет сырые кнопки (должен быть Button)
+    ("raw_input", re.compile(r'<input')),              # Ищет сырые инпуты (должен быть Input)
+    ("class_name_string", re.compile(r'className="[^"\n]*[^\S\n]{2,}[^"\n]*"'))  # Не выходит за пределы строки
+]
+
+# Литерал, без которого паттерн заведомо не совпадёт — дешёвый префильтр перед regex
+LITERALS = {
+    "magic_hex": "#",
+    "inline_style": "style={{",
+    "raw_button": "<button",
+    "raw_input": "<input",
+    "class_name_string": 'className="'
 }
 
-IGNORE_FILES = ['tailwind.config.ts', 'vite.config.ts']
+NEWLINE_RE = re.compile('\n')
+
+COMMENT_PREFIXES = ('//', '/*')
+
+IGNORE_FILES = frozenset({'tailwind.config.ts', 'vite.config.ts'})
+
+def get_worker_count() -> int:
+    "Сколько файлов сканировать параллельно: POLICE_WORKERS, иначе (не задано / мусор / <= 0) по числу ядер."
+    try:
+        workers = int(os.getenv("POLICE_WORKERS", ""))
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+POLICE_WORKERS = get_worker_count()
 
 def scan_file(filepath: str):
+    """
+    Возвращает (violations, error). Ничего не печатает: вызывается из потоков пула,
+    ошибку чтения логирует главный поток, чтобы строки в stdout не перемешивались.
+    """
     violations = []
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                line_num = i + 1
-                
-                if line.strip().startswith('//') or line.strip().startswith('/*'):
-                    continue
-
-                for code, pattern in PATTERNS.items():
-                    matches = re.findall(pattern, line)
-                    if matches:
-                        if code == "magic_hex" and ("url(" in line or "id=" in line):
-                            continue
-                            
-                        violations.append({
-                            "type": code,
-                            "line": line_num,
-                            "match": matches[0],
-                            "content": line.strip()[:50] + "..."
-                        })
+            data = f.read()
     except Exception as e:
-        emit_log(f"Error reading {filepath}: {str(e)}")
-        
-    return violations
+        return violations, f"Error reading {filepath}: {str(e)}"
+
+    # Каждое правило — один finditer по всему файлу; номер строки считаем по позициям переводов строк
+    newlines = [m.start() for m in NEWLINE_RE.finditer(data)]
+    line_matches = {}  # индекс строки -> {правило: первое совпадение}
+    for code, pattern in PATTERNS:
+        if LITERALS[code] not in data:
+            continue
+
+        for match in pattern.finditer(data):
+            line_idx = bisect_left(newlines, match.start())
+            line_matches.setdefault(line_idx, {}).setdefault(code, match.group())
+
+    for line_idx in sorted(line_matches):
+        first_matches = line_matches[line_idx]
+        start = newlines[line_idx - 1] + 1 if line_idx else 0
+        end = newlines[line_idx] if line_idx < len(newlines) else len(data)
+        line = data[start:end]
+
+        stripped = line.strip()
+        if stripped.startswith(COMMENT_PREFIXES):
+            continue
+
+        for code, _ in PATTERNS:
+            if code not in first_matches:
+                continue
+
+            if code == "magic_hex" and ("url(" in line or "id=" in line):
+                continue
+
+            violations.append({
+                "type": code,
+                "line": line_idx + 1,
+                "match": first_matches[code],
+                "content": stripped[:50] + "..."
+            })
+
+    return violations, None
 
 def inspect_codebase(target_path: str):
     report = {
@@ -54,26 +104,27 @@ def inspect_codebase(target_path: str):
     
     logs = [f"👮 Starting Code Police Scan on: {target_path}"]
 
-    for root, dirs, files in os.walk(target_path):
-        for ignore in ['node_modules', 'dist', 'build', '.git', 'venv']:
-            if ignore in dirs:
-                dirs.remove(ignore)
+    candidates = []
+    for entry in walk_entries(target_path):
+        name = entry.name
+        if not name.endswith('.tsx') or name in IGNORE_FILES or entry.is_dir(): # Проверяем только компоненты (пока)
+            continue
 
-        for file in files:
-            if not file.endswith('.tsx'): # Проверяем только компоненты (пока)
-                continue
-                
-            if file in IGNORE_FILES:
-                continue
+        candidates.append(entry.path)
+
+    report["files_checked"] = len(candidates)
+
+    # entry.path уже = target_path + sep + относительный путь, relpath не нужен
+    prefix_len = len(os.path.join(target_path, ''))
+
+    # map() отдаёт результаты в порядке входа, так что отчёт детерминирован
+    with ThreadPoolExecutor(max_workers=POLICE_WORKERS) as executor:
+        for full_path, (file_violations, error) in zip(candidates, executor.map(scan_file, candidates)):
+            if error:
+                emit_log(error)
 
-            report["files_checked"] += 1
-            full_path = os.path.join(root, file)
-            
-            rel_path = os.path.relpath(full_path, target_path)
-            
-            file_violations = scan_file(full_path)
-            
             if file_violations:
+                rel_path = full_path[prefix_len:]
                 report["total_violations"] += len(file_violations)
                 report["files_with_violations"] += 1
                 report["details"][rel_path] = file_violations
@@ -1,8 +1,12 @@
+import io
 import os
+import json
 import logging
 import sys
 import time
 import re
+import functools
+import tempfile
 from typing import Tuple, Optional
 
 # --- NEW SDK IMPORTS ---
@@ -21,6 +25,13 @@ logger = logging.getLogger(__name__)
 # Extensions to watch
 REVIEWABLE_EXTENSIONS = ('.ts', '.tsx', '.js', '.css', '.sql', '.py', '.md', '.json', '.yml', '.toml')
 
+# Ignore lockfiles and build artifacts and repomix output
+SKIP_PATH_SUBSTRINGS = ("package-lock.json", "yarn.lock", "pnpm-lock.yaml", "dist/", "out/", "build/", "repomix-output.xml")
+SKIP_PATHS_RE = re.compile("|".join(map(re.escape, SKIP_PATH_SUBSTRINGS)))
+
+# Per-file patch limit (chars) before truncation
+MAX_PATCH_CHARS = 20000
+
 # Models priority
 MODEL_PRIORITIES = [
 
@@ -42,6 +53,29 @@ MODEL_PRIORITIES = [
 
 DEFAULT_MODEL_NAME = "gemini-2.0-flash"
 
+# Rate-limit hints in API error messages; group 1 is the suggested delay in seconds
+RETRY_DELAY_RE = re.compile(
+    r'(?:retry in|retry after|wait) (\d+(?:\.\d+)?) seconds?|429|resource exhausted',
+    re.IGNORECASE
+)
+
+# Static part of the review request, sent between the PR context and the diff
+REVIEW_INSTRUCTIONS = """
+# INSTRUCTIONS
+Review the code changes below.
+- Verify if the code changes match the PR intent described above.
+- If the user explicitly states they are removing a feature (like a Worker) for simplification, DO NOT flag it as a "Performance issue" unless it breaks the app completely.
+- Focus on Security, Bugs, and sloppy Types.
+
+"""
+
+# Models reported as unavailable (404 / NOT_FOUND) are skipped for this long (seconds)
+MODEL_FAILURE_TTL = 3600
+
+# Errors meaning the model itself does not exist for this key/API version.
+# Transient failures (5xx, timeouts, auth) must not put a model on the skip list.
+MODEL_UNAVAILABLE_RE = re.compile(r'\b404\b|\bNOT_FOUND\b')
+
 class ReviewerError(Exception):
     "Base class for reviewer script errors."
     pass
@@ -52,7 +86,12 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 REPO_NAME = os.getenv("REPO_NAME")
 PR_NUMBER_STR = os.getenv("PR_NUMBER")
 MODEL_NAME = os.getenv("MODEL_NAME", DEFAULT_MODEL_NAME)
+MODEL_FAILURE_CACHE_PATH = os.getenv(
+    "MODEL_FAILURE_CACHE_PATH",
+    os.path.join(os.getenv("RUNNER_TEMP") or tempfile.gettempdir(), "gemini_neg.json")
+)
 
+@functools.lru_cache(maxsize=1)
 def load_prompt() -> str:
     "Loads the system prompt from system_prompt.md file."
     try:
@@ -68,6 +107,11 @@ def load_prompt() -> str:
                 return f.read()
         raise ReviewerError(f"system_prompt.md not found in {script_dir} or current dir!")
 
+@functools.lru_cache(maxsize=1)
+def get_github_client() -> Github:
+    "Returns a shared authenticated GitHub client (one connection pool per run)."
+    return Github(auth=Auth.Token(GITHUB_TOKEN))
+
 def get_pr_data() -> Tuple[object, str, str, str]:
     """
     Fetches PR diff AND context (Title/Description) from GitHub.
@@ -77,14 +121,11 @@ def get_pr_data() -> Tuple[object, str, str, str]:
         raise ValueError("Missing GitHub credentials or PR info.")
     
     try:
-        auth = Auth.Token(GITHUB_TOKEN)
-        g = Github(auth=auth)
-        
-        repo = g.get_repo(REPO_NAME)
+        repo = get_github_client().get_repo(REPO_NAME)
         pr = repo.get_pull(int(PR_NUMBER_STR))
         
         files = pr.get_files()
-        diff_content = []
+        diff_buf = io.StringIO()
         
         logger.info(f"Processing PR #{PR_NUMBER_STR}: {pr.title}")
 
@@ -92,8 +133,7 @@ def get_pr_data() -> Tuple[object, str, str, str]:
             if f.status == "removed":
                 continue
             
-            # Ignore lockfiles and build artifacts and repomix output
-            if any(x in f.filename for x in ["package-lock.json", "yarn.lock", "pnpm-lock.yaml", "dist/", "out/", "build/", "repomix-output.xml"]):
+            if SKIP_PATHS_RE.search(f.filename):
                 continue
 
             if f.filename.endswith(REVIEWABLE_EXTENSIONS):
@@ -102,11 +142,18 @@ def get_pr_data() -> Tuple[object, str, str, str]:
                     logger.warning(f"Skipping {f.filename}: No patch data available (binary or too large).")
                     continue
 
+                if diff_buf.tell():
+                    diff_buf.write("\n\n")
+                diff_buf.write("### File: ")
+                diff_buf.write(f.filename)
+                diff_buf.write("\n```diff\n")
                 # Limit patch size per file to avoid context overflow on huge files
-                patch = f.patch if len(f.patch) < 20000 else f.patch[:20000] + "\n... [TRUNCATED]"
-                diff_content.append(f"### File: {f.filename}\n```diff\n{patch}\n```")
+                diff_buf.write(f.patch[:MAX_PATCH_CHARS])
+                if len(f.patch) > MAX_PATCH_CHARS:
+                    diff_buf.write("\n... [TRUNCATED]")
+                diff_buf.write("\n```")
         
-        full_diff = "\n\n".join(diff_content)
+        full_diff = diff_buf.getvalue()
         return pr, full_diff, pr.title, (pr.body or "No description provided.")
         
     except GithubException as e:
@@ -124,29 +171,20 @@ def analyze_code(diff_text: str, pr_title: str, pr_desc: str, system_prompt: str
     client = genai.Client(api_key=GEMINI_API_KEY)
     
     # --- ENRICHED PROMPT WITH CONTEXT ---
-    user_message = f"""
-    {system_prompt}
-
-    # CONTEXT
-    **PR Title:** {pr_title}
-    **PR Description:** {pr_desc}
-
-    # INSTRUCTIONS
-    Review the code changes below. 
-    - Verify if the code changes match the PR intent described above.
-    - If the user explicitly states they are removing a feature (like a Worker) for simplification, DO NOT flag it as a "Performance issue" unless it breaks the app completely.
-    - Focus on Security, Bugs, and sloppy Types.
-
-    <code_diff>
-    {diff_text}
-    </code_diff>
-    """
+    # Sent as separate parts so the (potentially huge) diff is never copied into one big prompt string
+    contents = [
+        types.Part.from_text(text=system_prompt),
+        types.Part.from_text(text=f"\n\n# CONTEXT\n**PR Title:** {pr_title}\n**PR Description:** {pr_desc}\n"),
+        types.Part.from_text(text=REVIEW_INSTRUCTIONS + "<code_diff>\n"),
+        types.Part.from_text(text=diff_text),
+        types.Part.from_text(text="\n</code_diff>"),
+    ]
     
     try:
         # --- NEW SDK GENERATION CALL ---
         response = client.models.generate_content(
             model=model_name,
-            contents=user_message,
+            contents=contents,
             config=types.GenerateContentConfig(
                 max_output_tokens=8192,
                 temperature=0.2,
@@ -157,25 +195,33 @@ def analyze_code(diff_text: str, pr_title: str, pr_desc: str, system_prompt: str
         raise ReviewerError(f"Unexpected error during analysis: {e}")
 
 def parse_retry_delay(error_message: str) -> Optional[float]:
-    patterns = [
-        r'retry in (\d+(?:\.\d+)?) seconds?',
-        r'retry after (\d+(?:\.\d+)?) seconds?',
-        r'wait (\d+(?:\.\d+)?) seconds?',
-        r'429',
-        r'resource exhausted'
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, error_message.lower())
-        if match:
-            try:
-                # If we matched a number group
-                if match.groups():
-                    return float(match.group(1))
-                return 5.0 # Default wait if just 429 detected
-            except (ValueError, IndexError):
-                return 5.0
+    # An explicit delay wins over a bare 429 anywhere in the message
+    match = None
+    for match in RETRY_DELAY_RE.finditer(error_message):
+        if match.group(1):
+            return float(match.group(1))
+    if match:
+        return 5.0 # Default wait if just 429 detected
     return None
 
+def load_model_failures() -> dict:
+    "Loads the model_name -> last failure timestamp cache (empty if missing or corrupt)."
+    try:
+        with open(MODEL_FAILURE_CACHE_PATH, 'r', encoding='utf-8') as f:
+            failures = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(failures, dict):
+        return {}
+    return {name: ts for name, ts in failures.items() if isinstance(ts, (int, float))}
+
+def save_model_failures(failures: dict) -> None:
+    try:
+        with open(MODEL_FAILURE_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(failures, f)
+    except OSError as e:
+        logger.warning(f"Could not write model failure cache: {e}")
+
 def main() -> None:
     try:
         system_prompt = load_prompt()
@@ -189,6 +235,15 @@ def main() -> None:
         if MODEL_NAME and MODEL_NAME not in MODEL_PRIORITIES:
             models_to_try.insert(0, MODEL_NAME)
 
+        # Skip models recently reported unavailable (404 / NOT_FOUND), unless that would skip all of them
+        model_failures = load_model_failures()
+        now = time.time()
+        available_models = [m for m in models_to_try if now - model_failures.get(m, 0) > MODEL_FAILURE_TTL]
+        if available_models and len(available_models) < len(models_to_try):
+            skipped = [m for m in models_to_try if m not in available_models]
+            logger.info(f"Skipping models recently reported unavailable: {', '.join(skipped)}")
+            models_to_try = available_models
+
         review_comment = None
         successful_model = None
         last_error = None
@@ -200,6 +255,8 @@ def main() -> None:
                 review_comment = analyze_code(diff_text, pr_title, pr_desc, system_prompt, model_name)
                 successful_model = model_name
                 logger.info(f"Successfully analyzed with {model_name}")
+                if model_failures.pop(model_name, None) is not None:
+                    save_model_failures(model_failures)
                 break
                 
             except Exception as e:
@@ -213,6 +270,9 @@ def main() -> None:
                     continue
                 
                 logger.warning(f"API Error ({model_name}): {e}. Switching to next model...")
+                if MODEL_UNAVAILABLE_RE.search(error_message):
+                    model_failures[model_name] = time.time()
+                    save_model_failures(model_failures)
                 continue
         
         if review_comment and successful_model:
@@ -3,6 +3,7 @@ Python Bridge utilities package.
 """
 
 from .io_helper import emit_success, emit_error, emit_log
+from .fs_helper import walk_entries, PRUNE_DIRS
 
-__all__ = ["emit_success", "emit_error", "emit_log"]
+__all__ = ["emit_success", "emit_error", "emit_log", "walk_entries", "PRUNE_DIRS"]
 
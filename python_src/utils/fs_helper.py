@@ -0,0 +1,32 @@
+import os
+from typing import FrozenSet, Iterator
+
+__all__ = ["walk_entries", "PRUNE_DIRS"]
+
+PRUNE_DIRS = frozenset({'node_modules', 'venv', '.venv', '.git', 'dist', 'build', '__pycache__'})
+
+def walk_entries(path: str, prune: FrozenSet[str] = PRUNE_DIRS) -> Iterator[os.DirEntry]:
+    """
+    Walks the tree like os.walk (top-down, files before subdirectories, no
+    symlinked dirs descended into) but yields the raw os.DirEntry objects,
+    so callers reuse the stat data cached by scandir instead of re-stat'ing.
+    Directories are yielded too; pruned ones are skipped entirely.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir():
+            if entry.name not in prune:
+                subdirs.append(entry)
+        else:
+            yield entry
+
+    for entry in subdirs:
+        yield entry
+        if not entry.is_symlink():
+            yield from walk_entries(entry.path, prune)
\ No newline at end of file
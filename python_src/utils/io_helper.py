@@ -1,7 +1,32 @@
+import os
 import sys
 import json
 from typing import Any, List, Optional
 
+__all__ = ["emit_success", "emit_error", "emit_log"]
+
+# EMIT_FAST_EXIT=1: fatal errors leave via os._exit, skipping interpreter teardown
+FAST_EXIT = os.getenv("EMIT_FAST_EXIT") == "1"
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is the fallback
+    orjson = None
+
+def _write_json(payload: Any):
+    # Always raw UTF-8 (bridge.ts decodes stdout as utf8), whichever serializer is available
+    try:
+        if orjson is not None:
+            encoded = orjson.dumps(payload)
+        else:
+            encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except (TypeError, UnicodeEncodeError):
+        # Lone surrogates (non-UTF-8 filenames on POSIX) have no UTF-8 form;
+        # ASCII-escaped JSON carries them as \uXXXX like plain json.dumps always did
+        encoded = json.dumps(payload, separators=(",", ":")).encode("ascii")
+    sys.stdout.buffer.write(encoded + b"\n")
+    sys.stdout.buffer.flush()
+
 def emit_log(message: str):
     print(message)
     sys.stdout.flush()
@@ -16,11 +41,15 @@ def emit_success(data: Any = None, logs: Optional[List[str]] = None):
         "data": data
     }
     sys.stdout.flush()
-    print(json.dumps(response))
+    _write_json(response)
     sys.exit(0)
 
 def emit_error(message: str, details: Any = None):
     sys.stderr.write(message + "\n")
     if details:
         sys.stderr.write(json.dumps(details) + "\n")
+    if FAST_EXIT:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(1)
     sys.exit(1)
\ No newline at end of file
@@ -50,12 +50,16 @@ export class PythonBridge {
       let stdoutData = "";
       let stderrData = "";
 
-      proc.stdout.on("data", (data) => {
-        stdoutData += data.toString();
+      // Decode as a stream so multi-byte UTF-8 split across chunks stays intact
+      proc.stdout.setEncoding("utf8");
+      proc.stderr.setEncoding("utf8");
+
+      proc.stdout.on("data", (data: string) => {
+        stdoutData += data;
       });
 
-      proc.stderr.on("data", (data) => {
-        stderrData += data.toString();
+      proc.stderr.on("data", (data: string) => {
+        stderrData += data;
       });
 
       proc.on("close", (code) => {